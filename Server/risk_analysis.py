@@ -1,99 +1,82 @@
 # risk_analysis.py
-import numpy as np
 
-def analyze_risk(current_price, growth_rate, volatility,
-                 sentiment_label="Neutral", sentiment_score=50.0,
-                 location_factor=1.0):
+# Try import numba; if not available the risk kernel runs as plain Python
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except Exception:
+    njit = None
+    _HAS_NUMBA = False
+
+# Keep market the dominant signal (70%), sentiment next (20%), price small (10%)
+# These are tunable; kept intentionally similar to prior weighting where market had high weight.
+W_MARKET = 0.70
+W_SENTIMENT = 0.20
+W_PRICE = 0.10
+
+# final level info indexed by (score >= 30) + (score >= 60)
+_LEVEL_INFO = (
+    ("Low", "Stable Market",
+     "Strong signals with low volatility. Good investment conditions."),
+    ("Moderate", "Caution Advised",
+     "Some mixed signals. Consider cautious investment."),
+    ("High", "High Risk",
+     "Negative sentiment or high volatility. Avoid large investments."),
+)
+
+
+def _risk_kernel(gr, vol, loc, s_score, cp, sent_sign):
     """
-    Composite risk: price + forecast (growth/volatility) + sentiment + location.
-    - current_price: numeric (expected in lakhs; if in rupees, convert before calling)
-    - growth_rate: fractional (0.05 = +5%)
-    - volatility: fractional (std of pct changes)
-    - sentiment_label: "Positive"/"Neutral"/"Negative"
-    - sentiment_score: 0..100 (RoBERTa score)
-    - location_factor: >1 safer, <1 riskier
-    Returns:
-      {
-        "score": float(0..100),
-        "level": "Low"/"Moderate"/"High",
-        "category": str,
-        "message": str,
-        "debug": {...}
-      }
+    Scalar part of analyze_risk (all floats in, all floats out).
+    - sent_sign: 1.0 positive, -1.0 negative, 0.0 neutral/other
+    Returns (market, sentiment, price, final_raw, final, market_level, sentiment_level)
     """
-
     # ---------------------------
     # 1) Market component (unchanged)
     # ---------------------------
-    gr_pct = float(growth_rate) * 100.0
-    vol_pct = float(volatility) * 100.0
+    gr_pct = gr * 100.0
+    vol_pct = vol * 100.0
 
     # keep your original market component formula
     market_component = (vol_pct * 1.5) - (gr_pct * 0.8)
 
     # location adjustment (your earlier multiplier)
-    adjusted_market = market_component * (1.2 - float(location_factor))
+    adjusted_market = market_component * (1.2 - loc)
 
     # clip to 0..100
-    market_risk_score = float(np.clip(adjusted_market, 0.0, 100.0))
+    market_risk_score = max(0.0, min(100.0, adjusted_market))
 
-    # market risk level numeric mapping: 1 low, 2 med, 3 high
-    if market_risk_score < 30:
-        market_risk_level = 1
-    elif market_risk_score < 60:
-        market_risk_level = 2
-    else:
-        market_risk_level = 3
+    # market risk level numeric mapping: 1 low (<30), 2 med (<60), 3 high
+    market_risk_level = 1.0 + (market_risk_score >= 30) + (market_risk_score >= 60)
 
     # ---------------------------
     # 2) Sentiment component
     # ---------------------------
-    sent = (sentiment_label or "Neutral").strip().lower()
-    s_score = float(sentiment_score or 50.0)  # 0..100
-
     # sentiment numeric risk mapping (1 low .. 3 high)
     # Positive + high score -> low risk; Negative or very low score -> high risk
-    if (sent == "positive" and s_score >= 60):
-        sentiment_risk_level = 1
-    elif (sent == "negative" or s_score < 40):
-        sentiment_risk_level = 3
+    if sent_sign > 0.0 and s_score >= 60:
+        sentiment_risk_level = 1.0
+    elif sent_sign < 0.0 or s_score < 40:
+        sentiment_risk_level = 3.0
     else:
-        sentiment_risk_level = 2
+        sentiment_risk_level = 2.0
 
-    # For numeric sentiment contribution we convert positivity -> lower risk.
-    # We'll define sentiment_numeric: lower means safer.
     # Map s_score (0..100) -> sentiment_numeric_risk (0..100) where higher is more risky.
     # Simpler: sentiment_numeric_risk = 100 - s_score  (positive -> small risk, negative -> large)
-    sentiment_numeric_risk = float(np.clip(100.0 - s_score, 0.0, 100.0))
+    sentiment_numeric_risk = max(0.0, min(100.0, 100.0 - s_score))
 
     # ---------------------------
     # 3) Price component (NEW)
     # ---------------------------
-    # current_price expected in lakhs (if in rupees, divide by 1e5 first)
-    # We add a small price-driven risk: extremely expensive properties may be slightly riskier.
-    # This is intentionally conservative — price should not swamp market+sentiment.
-    try:
-        cp = float(current_price or 0.0)
-    except Exception:
-        cp = 0.0
-
     # simple heuristic:
     #  - cp <= 10 lakhs -> price_risk small (cheap)
     #  - cp around 50 lakhs -> price_risk modest
     #  - cp > 200 lakhs -> price_risk higher
-    price_risk_score = np.clip((cp / 200.0) * 100.0, 0.0, 100.0)  # 0..100
-    # price_risk_score is small for normal cp values; adjust multiplier above if you want stronger effect
+    price_risk_score = max(0.0, min(100.0, (cp / 200.0) * 100.0))  # 0..100
 
     # ---------------------------
     # 4) Combine components with weights
     # ---------------------------
-    # Keep market the dominant signal (70%), sentiment next (20%), price small (10%)
-    # These are tunable; kept intentionally similar to prior weighting where market had high weight.
-    W_MARKET = 0.70
-    W_SENTIMENT = 0.20
-    W_PRICE = 0.10
-
-    # final_numeric_score: lower means less risk; we already have market_risk_score (higher = more risk)
     final_numeric_raw = (
         market_risk_score * W_MARKET +
         sentiment_numeric_risk * W_SENTIMENT +
@@ -101,42 +84,92 @@ def analyze_risk(current_price, growth_rate, volatility,
     )
 
     # normalize / clip
-    final_numeric_score = float(np.clip(round(final_numeric_raw, 2), 0.0, 100.0))
+    final_numeric_score = max(0.0, min(100.0, round(final_numeric_raw, 2)))
 
-    # Convert composite numeric -> final level (same thresholds as before)
-    if final_numeric_score < 30:
-        level = "Low"
-        category = "Stable Market"
-        message = "Strong signals with low volatility. Good investment conditions."
-    elif final_numeric_score < 60:
-        level = "Moderate"
-        category = "Caution Advised"
-        message = "Some mixed signals. Consider cautious investment."
+    return (market_risk_score, sentiment_numeric_risk, price_risk_score,
+            final_numeric_raw, final_numeric_score,
+            market_risk_level, sentiment_risk_level)
+
+
+if _HAS_NUMBA:
+    # eager signature: compiled once at import (and cached on disk), not on the first request
+    try:
+        _risk_kernel = njit(
+            'UniTuple(float64, 7)(float64, float64, float64, float64, float64, float64)',
+            cache=True,
+        )(_risk_kernel)
+    except Exception as e:
+        # no writable cache location or a compile error: keep the plain-Python kernel
+        print("Warning: numba could not compile the risk kernel — using plain Python. Error:", e)
+
+
+def analyze_risk(current_price, growth_rate, volatility,
+                 sentiment_label="Neutral", sentiment_score=50.0,
+                 location_factor=1.0, include_debug=False):
+    """
+    Composite risk: price + forecast (growth/volatility) + sentiment + location.
+    - current_price: numeric (expected in lakhs; if in rupees, convert before calling)
+    - growth_rate: fractional (0.05 = +5%)
+    - volatility: fractional (std of pct changes)
+    - sentiment_label: "Positive"/"Neutral"/"Negative"
+    - sentiment_score: 0..100 (RoBERTa score)
+    - location_factor: >1 safer, <1 riskier
+    - include_debug: also return the component breakdown under "debug"
+    Returns:
+      {
+        "score": float(0..100),
+        "level": "Low"/"Moderate"/"High",
+        "category": str,
+        "message": str,
+        "debug": {...}      # only when include_debug=True
+      }
+    """
+    sent = (sentiment_label or "Neutral").strip().lower()
+    if sent == "positive":
+        sent_sign = 1.0
+    elif sent == "negative":
+        sent_sign = -1.0
     else:
-        level = "High"
-        category = "High Risk"
-        message = "Negative sentiment or high volatility. Avoid large investments."
+        sent_sign = 0.0
+    s_score = float(sentiment_score or 50.0)  # 0..100
+
+    # current_price expected in lakhs (if in rupees, divide by 1e5 first)
+    try:
+        cp = float(current_price or 0.0)
+    except Exception:
+        cp = 0.0
+
+    (market_risk_score, sentiment_numeric_risk, price_risk_score,
+     final_numeric_raw, final_numeric_score,
+     market_risk_level, sentiment_risk_level) = _risk_kernel(
+        float(growth_rate), float(volatility), float(location_factor),
+        s_score, cp, sent_sign)
+
+    # Convert composite numeric -> final level (same thresholds as before)
+    level, category, message = _LEVEL_INFO[(final_numeric_score >= 30) + (final_numeric_score >= 60)]
+
+    result = {
+        "score": final_numeric_score,
+        "level": level,
+        "category": category,
+        "message": message,
+    }
+    if not include_debug:
+        return result
 
     # debug info to trace internals (very useful in UI)
-    debug = {
+    result["debug"] = {
         "market_risk_score": market_risk_score,
-        "market_risk_level": market_risk_level,
+        "market_risk_level": int(market_risk_level),
         "sentiment_label": sentiment_label,
         "sentiment_score": s_score,
         "sentiment_numeric_risk": sentiment_numeric_risk,
-        "sentiment_risk_level": sentiment_risk_level,
+        "sentiment_risk_level": int(sentiment_risk_level),
         "price_risk_score": price_risk_score,
         "weights": {"market": W_MARKET, "sentiment": W_SENTIMENT, "price": W_PRICE},
         "final_raw": final_numeric_raw
     }
-
-    return {
-        "score": final_numeric_score,
-        "level": level,
-        "category": category,
-        "message": message,
-        "debug": debug
-    }
+    return result
 
 
 def get_prescription(risk_score, growth_rate):
@@ -5,6 +5,7 @@ RoBERTa sentiment integration.
 - Fetches live headlines via NewsAPI (if NEWSAPI_KEY provided) and aggregates
 - Provides functions:
     get_sentiment_for_topic(topic, top_k=10) -> (label, score_percent, details)
+    get_sentiment_for_topics(topics) -> {topic: (label, score_percent, details)}
     analyze_text(text) -> (label, score_percent)
 """
 # server.py (top of file)
@@ -36,6 +37,10 @@ def _init_pipeline():
     return _pipeline
 
 
+# shared session: keeps the NewsAPI connection (and TLS handshake) alive between calls
+_session = requests.Session()
+
+
 def _fetch_newsapi_headlines(query, api_key=None, page_size=20):
     """
     Fetch headlines from NewsAPI. Returns list of title strings.
@@ -54,7 +59,7 @@ def _fetch_newsapi_headlines(query, api_key=None, page_size=20):
         "apiKey": key
     }
     try:
-        r = requests.get(url, params=params, timeout=10)
+        r = _session.get(url, params=params, timeout=10)
         r.raise_for_status()
         j = r.json()
         items = j.get("articles", [])
@@ -65,18 +70,144 @@ def _fetch_newsapi_headlines(query, api_key=None, page_size=20):
 
 
 # sentiment_roberta.py (replace or update file)
-import os, time, requests
-from transformers import pipeline
-from collections import Counter
+import os, re, shutil, tempfile, time, requests
+import numpy as np
+import torch
+from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
+from functools import lru_cache
+from collections import OrderedDict
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Try import ONNX Runtime via optimum; if not available we stay on PyTorch
+try:
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import QuantizationConfig
+    from onnxruntime.quantization import QuantFormat, QuantizationMode, QuantType
+    _HAS_ORT = True
+except Exception:
+    ORTModelForSequenceClassification = None
+    _HAS_ORT = False
 
 HF_MODEL = os.environ.get("SENT_MODEL", "cardiffnlp/twitter-roberta-base-sentiment")
+# Directory holding ONNX exports (built offline by export_onnx_model). Unset -> PyTorch backend.
+ONNX_DIR = os.environ.get("SENT_ONNX_DIR")
 _pipeline = None
 
+# raw HF label -> class code (0 Negative, 1 Neutral, 2 Positive); cardiffnlp emits
+# LABEL_0..2, other sentiment models (SENT_MODEL) use the plain names
+_LBL_MAP = {
+    'LABEL_0': 0, 'LABEL_1': 1, 'LABEL_2': 2,
+    'negative': 0, 'neutral': 1, 'positive': 2,
+    'NEGATIVE': 0, 'NEUTRAL': 1, 'POSITIVE': 2,
+}
+_LBL_UNKNOWN = 3
+_LBL_NAMES = ("Negative", "Neutral", "Positive", "Neutral")
+# per-code positivity coefficients: positivity = _POS_A * score + _POS_B
+_POS_A = np.array([-1.0, 0.5, 1.0, 0.0])
+_POS_B = np.array([1.0, 0.0, 0.0, 0.5])
+
+# topic -> (expiry_ts, result), least recently used first; NewsAPI headlines for a
+# locality change slowly. Bounded because topics come from client input.
+_topic_cache = OrderedDict()
+_topic_cache_lock = threading.Lock()  # guards _topic_cache (Flask dev server is threaded)
+_TOPIC_CACHE_TTL = 600  # seconds
+_TOPIC_CACHE_SIZE = 256
+
+# background workers for NewsAPI fetches: the network wait overlaps model loading,
+# and get_sentiment_for_topics fans out several topics at once
+_pool = ThreadPoolExecutor(max_workers=4)
+
+def _onnx_model_dir():
+    """ONNX export of HF_MODEL: one subdirectory of ONNX_DIR per model name."""
+    return os.path.join(ONNX_DIR, HF_MODEL.replace("/", "__"))
+
+
+def export_onnx_model():
+    """
+    One-time offline step (run this module as a script): export HF_MODEL to ONNX
+    and quantize it into _onnx_model_dir(). Everything is built in a temp directory
+    that is renamed into place, so a killed or concurrent run never leaves a
+    partial model behind.
+    """
+    if not (_HAS_ORT and ONNX_DIR):
+        raise RuntimeError("ONNX export needs optimum[onnxruntime] and SENT_ONNX_DIR")
+    model_dir = _onnx_model_dir()
+    if os.path.exists(os.path.join(model_dir, "model_quantized.onnx")):
+        return model_dir
+    # incomplete directory (e.g. left by an older layout): rebuild it
+    shutil.rmtree(model_dir, ignore_errors=True)
+
+    os.makedirs(ONNX_DIR, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".export-", dir=ONNX_DIR)
+    try:
+        ort_model = ORTModelForSequenceClassification.from_pretrained(HF_MODEL, export=True)
+        ort_model.save_pretrained(tmp_dir)
+        # dynamic int8 in QOperator format: the CPU EP runs the MatMuls as integer
+        # kernels (VNNI dot products where the CPU has them)
+        qconfig = QuantizationConfig(
+            is_static=False,
+            format=QuantFormat.QOperator,
+            mode=QuantizationMode.IntegerOps,
+            activations_dtype=QuantType.QUInt8,
+            weights_dtype=QuantType.QInt8,
+            per_channel=False,
+        )
+        quantizer = ORTQuantizer.from_pretrained(tmp_dir, file_name="model.onnx")
+        quantizer.quantize(save_dir=tmp_dir, quantization_config=qconfig)
+        try:
+            os.replace(tmp_dir, model_dir)
+        except OSError:
+            # another run published the same model first
+            if not os.path.isdir(model_dir):
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return model_dir
+
+
+def _load_onnx_model():
+    """
+    int8 ONNX Runtime model built by export_onnx_model() (graph-optimized, CPU provider).
+    Only loads; the export itself is too slow to run inside a request.
+    """
+    model_dir = _onnx_model_dir()
+    if not os.path.isdir(model_dir):
+        raise FileNotFoundError(
+            f"no ONNX export of {HF_MODEL} at {model_dir}; run `python sentiment_roberta.py` once")
+    try:
+        mdl = ORTModelForSequenceClassification.from_pretrained(
+            model_dir, file_name="model_quantized.onnx", provider="CPUExecutionProvider")
+    except Exception:
+        # unloadable export (e.g. a truncated model_quantized.onnx): remove it so the
+        # next export run rebuilds it instead of every start silently using PyTorch
+        shutil.rmtree(model_dir, ignore_errors=True)
+        raise
+    providers = mdl.model.get_providers()
+    if "CPUExecutionProvider" not in providers:
+        print("Warning: ONNX Runtime session is not using CPUExecutionProvider:", providers)
+    return mdl
+
+
 def _init_pipeline():
     global _pipeline
     if _pipeline is None:
-        # cpu device by default; set device=0 for GPU
-        _pipeline = pipeline("sentiment-analysis", model=HF_MODEL, device=-1)
+        # Rust tokenizer; headlines and short texts never need the full 512 tokens
+        tok = AutoTokenizer.from_pretrained(HF_MODEL, use_fast=True, model_max_length=128)
+        mdl = None
+        if _HAS_ORT and ONNX_DIR:
+            try:
+                mdl = _load_onnx_model()
+            except Exception as e:
+                print("Warning: ONNX Runtime model unavailable — using PyTorch. Error:", e)
+        if mdl is None:
+            torch.set_num_threads(os.cpu_count() or 1)
+            mdl = AutoModelForSequenceClassification.from_pretrained(HF_MODEL)
+            # int8 weights for the Linear layers (attention + FFN GEMMs dominate CPU time)
+            mdl = torch.quantization.quantize_dynamic(mdl, {torch.nn.Linear}, dtype=torch.qint8)
+            mdl.eval()
+        # cpu device by default (dynamic quantization and the ORT model are CPU-only here)
+        _pipeline = pipeline("sentiment-analysis", model=mdl, tokenizer=tok, device=-1, framework="pt")
     return _pipeline
 
 def analyze_text(text):
@@ -88,44 +219,57 @@ def analyze_text(text):
     if not text or not str(text).strip():
         return {'sentiment': 'Neutral', 'score': 50.0, 'raw': {'reason': 'empty_input'}}
 
-    pipe = _init_pipeline()
     try:
-        out = pipe(text[:1000])  # list of results
-        if not out or not isinstance(out, list):
-            return {'sentiment': 'Neutral', 'score': 50.0, 'raw': {'reason': 'no_output'}}
-
-        r = out[0]
-        raw_label = r.get('label', '')
-        raw_score = float(r.get('score', 0.0))
-
-        lab = str(raw_label).lower()
-
-        # Map label to Positive/Neutral/Negative robustly
-        if lab in ("positive", "pos", "label_2", "label2", "LABEL_2".lower()):
-            sentiment = "Positive"
-            score_pct = raw_score * 100.0
-        elif lab in ("negative", "neg", "label_0", "label0", "LABEL_0".lower()):
-            sentiment = "Negative"
-            # convert model's confidence (score) to "positivity" percentage (so 0..100)
-            # for negative, we invert to give a "positive strength" measure if needed.
-            score_pct = (1.0 - raw_score) * 100.0
-        elif lab in ("neutral","neu" "label1"):
-            sentiment = "Neutral"
-            score_pct = raw_score * 100.0
+        # character cap keeps cache keys and tokenizer work bounded; 1000 chars is
+        # well past the 128-token limit that truncation=True enforces
+        sentiment, score_pct, raw_items = _analyze_text_cached(text[:1000])
+        return {'sentiment': sentiment, 'score': score_pct, 'raw': dict(raw_items)}
+    except Exception as e:
+        return {'sentiment': 'Neutral', 'score': 50.0, 'raw': {'error': str(e)}}
+
+
+@lru_cache(maxsize=512)
+def _analyze_text_cached(text):
+    """
+    Model call behind analyze_text, memoized per input text.
+    Returns an immutable (sentiment, score_pct, raw_items) tuple; errors propagate
+    (and are therefore not cached).
+    """
+    pipe = _init_pipeline()
+    out = pipe(text, truncation=True)  # list of results; tokenizer truncates to 128 tokens
+    if not out or not isinstance(out, list):
+        return ('Neutral', 50.0, (('reason', 'no_output'),))
+
+    r = out[0]
+    raw_label = r.get('label', '')
+    raw_score = float(r.get('score', 0.0))
+
+    lab = str(raw_label).lower()
+
+    # Map label to Positive/Neutral/Negative robustly
+    if lab in ("positive", "pos", "label_2", "label2", "LABEL_2".lower()):
+        sentiment = "Positive"
+        score_pct = raw_score * 100.0
+    elif lab in ("negative", "neg", "label_0", "label0", "LABEL_0".lower()):
+        sentiment = "Negative"
+        # convert model's confidence (score) to "positivity" percentage (so 0..100)
+        # for negative, we invert to give a "positive strength" measure if needed.
+        score_pct = (1.0 - raw_score) * 100.0
+    elif lab in ("neutral","neu" "label1"):
+        sentiment = "Neutral"
+        score_pct = raw_score * 100.0
+    else:
+        # fallback: try substring check
+        if "pos" in lab:
+            sentiment = "Positive"; score_pct = raw_score * 100.0
+        elif "neg" in lab:
+            sentiment = "Negative"; score_pct = (1.0 - raw_score) * 100.0
         else:
-            # fallback: try substring check
-            if "pos" in lab:
-                sentiment = "Positive"; score_pct = raw_score * 100.0
-            elif "neg" in lab:
-                sentiment = "Negative"; score_pct = (1.0 - raw_score) * 100.0
-            else:
-                sentiment = "Neutral"; score_pct = raw_score * 100.0
+            sentiment = "Neutral"; score_pct = raw_score * 100.0
 
-        score_pct = max(0.0, min(100.0, round(score_pct, 2)))
+    score_pct = max(0.0, min(100.0, round(score_pct, 2)))
 
-        return {'sentiment': sentiment, 'score': score_pct, 'raw': r}
-    except Exception as e:
-        return {'sentiment': 'Neutral', 'score': 50.0, 'raw': {'error': str(e)}}
+    return (sentiment, score_pct, tuple(r.items()))
 
 
 def aggregate_headlines_sentiment(headlines, chunk_size=8):
@@ -137,51 +281,161 @@ def aggregate_headlines_sentiment(headlines, chunk_size=8):
     if not headlines:
         return ("Neutral", 50.0, {"count": 0})
 
-    pipe = _init_pipeline()
     results = []
     # The pipeline can accept a list
     try:
+        pipe = _init_pipeline()
         # Keep length manageable
         sample = headlines[:chunk_size]
-        res = pipe(sample)
-        pos_scores = []
-        labels = []
-        for r in res:
-            labs = r.get("label", "").lower()
-            score = r.get("score", 0.0)
-            if "pos" in labs:
-                labels.append("Positive")
-                pos_scores.append(score)
-            elif "neu" in labs:
-                labels.append("Neutral")
-                pos_scores.append(score * 0.5)  # neutral less weight
-            elif "neg" in labs:
-                labels.append("Negative")
-                pos_scores.append(1 - score)  # invert negative for overall positivity
-            else:
-                labels.append(r.get("label", "Neutral"))
-                pos_scores.append(0.5)
-        # majority label
-        most = Counter(labels).most_common(1)[0][0]
+        # republished stories share a title: run the model once per unique
+        # (whitespace/case-normalized) headline and fan the results back out
+        uniq, idx, seen = [], [], {}
+        for h in sample:
+            key = re.sub(r'\s+', ' ', h.strip().lower())
+            if key not in seen:
+                seen[key] = len(uniq)
+                uniq.append(h)
+            idx.append(seen[key])
+        # one padded forward pass for the whole sample instead of one per headline
+        uniq_res = pipe(uniq, batch_size=min(32, len(uniq)), truncation=True, max_length=64)
+        n = len(uniq_res)
+        uniq_scores = np.fromiter((r.get("score", 0.0) for r in uniq_res), dtype=np.float64, count=n)
+        uniq_codes = np.fromiter((_LBL_MAP.get(r.get("label"), _LBL_UNKNOWN) for r in uniq_res),
+                                 dtype=np.int64, count=n)
+        idx = np.asarray(idx, dtype=np.intp)
+        scores, codes = uniq_scores[idx], uniq_codes[idx]
+        # positivity = a * score + b per class: negative inverted, neutral half weight,
+        # unknown labels a flat 0.5
+        pos_scores = _POS_A[codes] * scores + _POS_B[codes]
+        counts = np.bincount(codes, minlength=len(_LBL_NAMES))
+        labels = [_LBL_NAMES[c] for c in codes.tolist()]
+        # majority label (unknown counts as neutral; ties go to Neutral, then Positive)
+        neg, neu, pos = int(counts[0]), int(counts[1] + counts[3]), int(counts[2])
+        most = max((neu, "Neutral"), (pos, "Positive"), (neg, "Negative"), key=lambda c: c[0])[1]
         # average score_percent (scale to 0..100)
-        avg_score = float(sum(pos_scores) / max(1, len(pos_scores))) * 100.0
+        avg_score = float(pos_scores.mean()) * 100.0
         avg_score = round(avg_score, 2)
         return (most, avg_score, {"count": len(sample), "labels": labels})
     except Exception:
         return ("Neutral", 50.0, {"count": 0})
 
 
+def _copy_topic_result(result):
+    """Copy of a (label, score, details) result, so callers can't mutate the cached one."""
+    label, score, details = result
+    details = dict(details)
+    if "labels" in details:
+        details["labels"] = list(details["labels"])
+    return (label, score, details)
+
+
+def _topic_key(topic):
+    """Normalized cache key for a topic."""
+    return (topic or "").lower().strip()
+
+
+def _cached_topic(topic):
+    """Return (cache_key, cached_result or None) for a topic."""
+    key = _topic_key(topic)
+    with _topic_cache_lock:
+        hit = _topic_cache.get(key)
+        if hit is None:
+            return key, None
+        if hit[0] <= time.time():
+            del _topic_cache[key]
+            return key, None
+        _topic_cache.move_to_end(key)
+    return key, _copy_topic_result(hit[1])
+
+
+def _warm_pipeline(api_key=None):
+    """
+    Load the model while a NewsAPI fetch is in flight. Skipped without an API key
+    (no headlines to analyze); load errors are left to the usual fallbacks.
+    """
+    if not (api_key or os.environ.get("NEWSAPI_KEY")):
+        return
+    try:
+        _init_pipeline()
+    except Exception as e:
+        print("Warning: sentiment pipeline failed to load:", e)
+
+
+def _wait_headlines(fut):
+    """Collect a submitted NewsAPI fetch; any failure counts as no headlines."""
+    try:
+        return fut.result(timeout=11)
+    except Exception:
+        return []
+
+
+def _topic_sentiment(key, headlines):
+    """Aggregate fetched headlines and cache the result under `key`."""
+    result = aggregate_headlines_sentiment(headlines)
+    # only cache real results, not the error fallback
+    if result[2].get("count"):
+        entry = (time.time() + _TOPIC_CACHE_TTL, _copy_topic_result(result))
+        with _topic_cache_lock:
+            _topic_cache[key] = entry
+            _topic_cache.move_to_end(key)
+            while len(_topic_cache) > _TOPIC_CACHE_SIZE:
+                _topic_cache.popitem(last=False)
+    return result
+
+
 def get_sentiment_for_topic(topic, newsapi_key=None, fallback_text=None):
     """
     Main helper: tries to fetch headlines for `topic` via NewsAPI, analyzes them,
     returns (label, score_percent, details).
     - If NewsAPI key is missing or fetch fails: uses fallback_text if provided.
     """
-    headlines = _fetch_newsapi_headlines(topic, api_key=newsapi_key, page_size=20)
+    key, hit = _cached_topic(topic)
+    if hit is not None:
+        return hit
+
+    fut = _pool.submit(_fetch_newsapi_headlines, topic, newsapi_key, 20)
+    # load the model (first call only) while the request is in flight
+    _warm_pipeline(newsapi_key)
+    headlines = _wait_headlines(fut)
     if headlines:
-        return aggregate_headlines_sentiment(headlines)
+        return _topic_sentiment(key, headlines)
     # fallback: analyze the fallback_text if given
     if fallback_text:
         return analyze_text(fallback_text)
     # final fallback
     return ("Neutral", 50.0, {"reason": "no_data"})
+
+
+def get_sentiment_for_topics(topics, newsapi_key=None):
+    """
+    Several topics at once (e.g. a few localities in one request).
+    NewsAPI fetches for uncached topics run concurrently, so the network wait is
+    about one round trip instead of one per topic; inference stays on the caller's thread.
+    Returns {topic: (label, score_percent, details)}.
+    """
+    # topics that normalize to the same cache key share one fetch
+    by_key, pending = {}, {}
+    for topic in topics:
+        if _topic_key(topic) in by_key or _topic_key(topic) in pending:
+            continue
+        key, hit = _cached_topic(topic)
+        if hit is not None:
+            by_key[key] = hit
+        else:
+            pending[key] = _pool.submit(_fetch_newsapi_headlines, topic, newsapi_key, 20)
+
+    if pending:
+        _warm_pipeline(newsapi_key)
+    for key, fut in pending.items():
+        headlines = _wait_headlines(fut)
+        if headlines:
+            by_key[key] = _topic_sentiment(key, headlines)
+        else:
+            by_key[key] = ("Neutral", 50.0, {"reason": "no_data"})
+
+    return {topic: by_key[_topic_key(topic)] for topic in topics}
+
+
+# one-time ONNX export: SENT_ONNX_DIR=... python sentiment_roberta.py
+if __name__ == "__main__":
+    print("ONNX model ready at", export_onnx_model())
@@ -8,7 +8,7 @@ import math
 from flask_cors import CORS
 
 
-from sentiment_roberta import analyze_text, get_sentiment_for_topic
+from sentiment_roberta import analyze_text, get_sentiment_for_topics
 
 
 app = Flask(__name__)
@@ -141,13 +141,22 @@ def predict_future_price():
         data = request.get_json(force=True)
         text = (data.get("text") or "").strip()
 
+        # news sentiment for the market (only needed without user text) and for the
+        # locality, fetched together so the NewsAPI round trips overlap
+        topics = [location] if text else ["real estate", location]
+        try:
+            topic_sentiment = get_sentiment_for_topics(topics)
+            topic_error = None
+        except Exception as s_e:
+            topic_sentiment, topic_error = {}, s_e
+
         # CASE 1: user provided text
         if text:
             sentiment = risk_analysis.analyze_text(text)
 
             # CASE 2: no text → try news sentiment
         else:
-            label, score, details = get_sentiment_for_topic("real estate")
+            label, score, details = topic_sentiment.get("real estate") or ("Neutral", 50.0, {"error": str(topic_error)})
             sentiment = {
         "sentiment": label,
         "score": score,
@@ -166,12 +175,12 @@ def predict_future_price():
         prescription = risk_analysis.get_prescription(risk_result['score'], growth_rate)
         print("💊 Prescription:", prescription)
                 # 7) Sentiment analysis using RoBERTa model (live or fallback)
-        try:
-            sent_label, sent_score, sent_details = get_sentiment_for_topic(location)
+        if location in topic_sentiment:
+            sent_label, sent_score, sent_details = topic_sentiment[location]
             print(f"🧠 Sentiment for {location}: {sent_label} ({sent_score}%)")
-        except Exception as s_e:
-            print("⚠️ Sentiment analysis failed:", s_e)
-            sent_label, sent_score, sent_details = "Neutral", 50.0, {"error": str(s_e)}
+        else:
+            print("⚠️ Sentiment analysis failed:", topic_error)
+            sent_label, sent_score, sent_details = "Neutral", 50.0, {"error": str(topic_error)}
 
         # 7) build JSON response
         response = jsonify({
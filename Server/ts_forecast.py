@@ -2,6 +2,7 @@
 import pandas as pd
 import numpy as np
 import os
+import joblib
 
 # Try import ARIMA; if statsmodels not available we'll fallback to naive forecast
 try:
@@ -13,22 +14,33 @@ except Exception:
 
 _hpi_series = None
 _model_fit = None
+# plain-array copy of the _hpi_series values for the per-request scalar work
+_hpi_values = None     # float64 HPI values
+# steps -> (forecast, conf_int) for _PRECOMPUTED_STEPS only; cleared on every (re)fit
+_forecast_cache = {}
+# horizons (quarters) forecast right after fitting, so common requests never hit the Kalman filter
+_PRECOMPUTED_STEPS = (1, 2, 4, 8)
 
 
-def load_hpi_and_fit(csv_path='artifacts/bangalore_hpi.csv', arima_order=(1, 1, 1)):
+def _write_sidecar(path, write):
     """
-    Load HPI CSV and fit ARIMA (if available).
-    Accepts CSV with columns like: Date,HPI  (Date examples: Mar-17, Jun-17, ...)
-    or Quarter,ALL. It detects 'Date' or 'Quarter', and 'HPI' or 'ALL'.
+    Write a cache file next to the CSV via a temp file + os.replace, so other
+    gunicorn workers starting at the same time never read a half-written file.
+    `write` is called with the temp path.
     """
-    global _hpi_series, _model_fit
-
-    base = os.path.dirname(__file__)
-    path = os.path.join(base, csv_path) if not os.path.isabs(csv_path) else csv_path
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
 
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"CSV not found at {path}")
 
+def _read_hpi_csv(path):
+    """
+    Read the HPI CSV and return it sorted and indexed by its parsed date column.
+    """
     df = pd.read_csv(path)
 
     # detect date column
@@ -43,16 +55,50 @@ def load_hpi_and_fit(csv_path='artifacts/bangalore_hpi.csv', arima_order=(1, 1,
 
     # convert to datetime robustly (strip whitespace)
     df[date_col] = df[date_col].astype(str).str.strip()
-    parsed = pd.to_datetime(df[date_col], format=date_format, errors='coerce')
+    parsed = pd.to_datetime(df[date_col], format=date_format, errors='coerce', cache=True)
 
-    # if parsing failed (NaT), try a more flexible parse
+    # if parsing failed (NaT), try a more flexible per-element parse (pandas >= 2.0)
     if parsed.isna().any():
-        parsed = pd.to_datetime(df[date_col], errors='coerce')
+        parsed = pd.to_datetime(df[date_col], format='mixed', errors='coerce', cache=True)
 
     df[date_col] = parsed
     df = df.dropna(subset=[date_col]).copy()
     df = df.sort_values(date_col)
     df.set_index(date_col, inplace=True)
+    return df
+
+
+def load_hpi_and_fit(csv_path='artifacts/bangalore_hpi.csv', arima_order=(1, 1, 1)):
+    """
+    Load HPI CSV and fit ARIMA (if available).
+    Accepts CSV with columns like: Date,HPI  (Date examples: Mar-17, Jun-17, ...)
+    or Quarter,ALL. It detects 'Date' or 'Quarter', and 'HPI' or 'ALL'.
+    """
+    global _hpi_series, _model_fit, _hpi_values
+
+    base = os.path.dirname(__file__)
+    path = os.path.join(base, csv_path) if not os.path.isabs(csv_path) else csv_path
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"CSV not found at {path}")
+
+    # parsed copy of the CSV next to it; reused until the CSV changes
+    pq_path = path + '.parquet'
+    df = None
+    if os.path.exists(pq_path) and os.path.getmtime(pq_path) >= os.path.getmtime(path):
+        try:
+            df = pd.read_parquet(pq_path)
+        except Exception as e:
+            print("Warning: could not read HPI parquet cache — re-reading CSV. Error:", e)
+            df = None
+
+    if df is None:
+        df = _read_hpi_csv(path)
+        try:
+            _write_sidecar(pq_path, lambda tmp: df.to_parquet(tmp, engine='pyarrow'))
+        except Exception as e:
+            # pyarrow missing or read-only artifacts dir: just re-parse the CSV next time
+            print("Warning: could not write HPI parquet cache:", e)
 
     # detect HPI column
     if 'ALL' in df.columns:
@@ -76,15 +122,48 @@ def load_hpi_and_fit(csv_path='artifacts/bangalore_hpi.csv', arima_order=(1, 1,
         # fallback: simply sort and keep timestamps
         _hpi_series = _hpi_series.sort_index()
 
+    _hpi_values = _hpi_series.to_numpy(dtype=np.float64)
+
+    # forecasts from a previous fit are stale now
+    _forecast_cache.clear()
+
     # Fit ARIMA if available; otherwise leave _model_fit None (naive fallback)
     if _HAS_ARIMA:
-        try:
-            model = ARIMA(_hpi_series, order=arima_order)
-            _model_fit = model.fit()
-        except Exception as e:
-            # fitting failed; warn and use fallback
-            _model_fit = None
-            print("Warning: ARIMA fit failed — falling back to naive forecasting. Error:", e)
+        # fitted model saved next to the CSV; reused across restarts until the CSV changes
+        fit_path = f"{path}.arima_{'_'.join(str(o) for o in arima_order)}.joblib"
+        _model_fit = None
+        if os.path.exists(fit_path) and os.path.getmtime(fit_path) >= os.path.getmtime(path):
+            try:
+                _model_fit = joblib.load(fit_path)
+            except Exception as e:
+                print("Warning: could not load saved ARIMA fit — refitting. Error:", e)
+                _model_fit = None
+            # a fit that loads but can't forecast (e.g. pickled by another statsmodels
+            # version) must not stick around: drop the file and refit
+            if _model_fit is not None and not _precompute_forecasts():
+                print("Warning: saved ARIMA fit cannot forecast — refitting.")
+                _model_fit = None
+                _forecast_cache.clear()
+                try:
+                    os.remove(fit_path)
+                except OSError:
+                    pass
+
+        if _model_fit is None:
+            try:
+                model = ARIMA(_hpi_series, order=arima_order)
+                _model_fit = model.fit()
+            except Exception as e:
+                # fitting failed; warn and use fallback
+                _model_fit = None
+                print("Warning: ARIMA fit failed — falling back to naive forecasting. Error:", e)
+            else:
+                # only save a fit that forecasts
+                if _precompute_forecasts():
+                    try:
+                        _write_sidecar(fit_path, lambda tmp: joblib.dump(_model_fit, tmp))
+                    except Exception as e:
+                        print("Warning: could not save ARIMA fit:", e)
     else:
         _model_fit = None
         print("Warning: statsmodels ARIMA not available — falling back to naive forecasting.")
@@ -93,22 +172,40 @@ def load_hpi_and_fit(csv_path='artifacts/bangalore_hpi.csv', arima_order=(1, 1,
     return True
 
 
+def _precompute_forecasts():
+    """
+    Warm _forecast_cache for _PRECOMPUTED_STEPS with the current fit.
+    Returns False if forecasting fails.
+    """
+    try:
+        for s in _PRECOMPUTED_STEPS:
+            forecast_hpi(steps=s)
+        return True
+    except Exception as e:
+        print("Warning: could not precompute ARIMA forecasts:", e)
+        return False
+
+
 def forecast_hpi(steps=4):
     """
     Forecast next `steps` quarters.
     Returns (forecast_series (pd.Series), conf_int (pd.DataFrame or None))
     If ARIMA not available, returns naive forecast repeating last observed value.
     """
-    global _model_fit, _hpi_series
+    global _model_fit, _hpi_series, _hpi_values
     if _hpi_series is None:
         raise RuntimeError("HPI series not loaded. Call load_hpi_and_fit() first.")
 
+    cached = _forecast_cache.get(steps)
+    if cached is not None:
+        return _copy_forecast(*cached)
+
     if _model_fit is not None:
         res = _model_fit.get_forecast(steps=steps)
         forecast = res.predicted_mean
         conf_int = res.conf_int()
     else:
-        last = float(_hpi_series.iloc[-1])
+        last = float(_hpi_values[-1])
         forecast = pd.Series([last] * steps)
         conf_int = None
 
@@ -129,9 +226,18 @@ def forecast_hpi(steps=4):
         except Exception:
             pass
 
+    # steps comes from the client's horizon, so only the fixed common horizons are kept
+    if steps in _PRECOMPUTED_STEPS:
+        _forecast_cache[steps] = (forecast, conf_int)
+        return _copy_forecast(forecast, conf_int)
     return forecast, conf_int
 
 
+def _copy_forecast(forecast, conf_int):
+    """Hand out copies so callers can't mutate the cached forecast."""
+    return forecast.copy(), (conf_int.copy() if conf_int is not None else None)
+
+
 def get_market_forecast_summary(steps=4):
     """
     Returns (growth_rate, volatility, risk_label, forecast_series)
@@ -139,19 +245,23 @@ def get_market_forecast_summary(steps=4):
     - volatility is std of historical pct changes
     - risk_label is "Low"/"Moderate"/"High"
     """
-    global _hpi_series
+    global _hpi_series, _hpi_values
     if _hpi_series is None:
         # safe fallback: no HPI loaded
         return 0.0, 0.0, "Moderate", None
 
     try:
         forecast, _ = forecast_hpi(steps=steps)
-        last_hist = float(_hpi_series.iloc[-1])
+        last_hist = float(_hpi_values[-1])
         last_fore = float(forecast.iloc[-1])
         growth_rate = (last_fore - last_hist) / last_hist if last_hist != 0 else 0.0
 
-        returns = _hpi_series.pct_change().dropna()
-        volatility = float(returns.std()) if len(returns) > 0 else 0.0
+        # returns straight from the raw values; blank HPI cells give NaN returns,
+        # which are skipped (as pct_change().dropna() did). ddof=1 like Series.std()
+        arr = _hpi_values
+        r = arr[1:] / arr[:-1] - 1.0
+        r = r[np.isfinite(r)]
+        volatility = float(r.std(ddof=1)) if r.size > 1 else 0.0
 
         if growth_rate > 0.05 and volatility < 0.02:
             risk = "Low"